@@ -13,9 +13,9 @@ and is not intended to be imported.
 import sys
 import os
 import shutil
-import pwd
 import asyncio
 import atexit
+import signal
 
 VENDOR = "Gadget"
 MANUFACTURER = VENDOR
@@ -27,104 +27,110 @@ PRODUCT_ID = 0x0488
 SERIAL_NUMBER = "fedcba9876543210"
 
 REPORT_LENGTH = "8"
-REPORT_DESC = bytes([
-    0x05, 0x01,  # Usage Page (Generic Desktop Ctrls)
-    0x09, 0x06,  # Usage (Keyboard)
-    0xA1, 0x01,  # Collection (Application)
-    0x05, 0x07,  # Usage Page (Keyboard/Keypad)
-    0x19, 0xE0,  # Usage Minimum (0xE0)
-    0x29, 0xE7,  # Usage Maximum (0xE7)
-    0x15, 0x00,  # Logical Minimum (0)
-    0x25, 0x01,  # Logical Maximum (1)
-    0x75, 0x01,  # Report Size (1)
-    0x95, 0x08,  # Report Count (8)
-    0x81, 0x02,  # Input (Data,Var,Abs,No Wrap,Linear,Preferred State,No Null Position)
-    0x95, 0x01,  # Report Count (1)
-    0x75, 0x08,  # Report Size (8)
-    0x81, 0x03,  # Input (Const,Var,Abs,No Wrap,Linear,Preferred State,No Null Position)
-    0x95, 0x05,  # Report Count (5)
-    0x75, 0x01,  # Report Size (1)
-    0x05, 0x08,  # Usage Page (LEDs)
-    0x19, 0x01,  # Usage Minimum (Num Lock)
-    0x29, 0x05,  # Usage Maximum (Kana)
-    0x91, 0x02,  # Output (Data,Var,Abs)
-    0x95, 0x01,  # Report Count (1)
-    0x75, 0x03,  # Report Size (3)
-    0x91, 0x03,  # Output (Const,Var,Abs)
-    0x95, 0x06,  # Report Count (6)
-    0x75, 0x08,  # Report Size (8)
-    0x15, 0x00,  # Logical Minimum (0)
-    0x25, 0x65,  # Logical Maximum (101)
-    0x05, 0x07,  # Usage Page (Keyboard/Keypad)
-    0x19, 0x00,  # Usage Minimum (0x00)
-    0x29, 0x65,  # Usage Maximum (0x65)
-    0x81, 0x00,  # Input (Data,Array,Abs,No Wrap,Linear,Preferred State,No Null Position)
-    0xC0,  # End Collection
-])
+# Adjacent bytes literals are concatenated into a single constant at compile
+# time, so this builds no intermediate list of ints on import.
+REPORT_DESC = (
+    b"\x05\x01"  # Usage Page (Generic Desktop Ctrls)
+    b"\x09\x06"  # Usage (Keyboard)
+    b"\xA1\x01"  # Collection (Application)
+    b"\x05\x07"  # Usage Page (Keyboard/Keypad)
+    b"\x19\xE0"  # Usage Minimum (0xE0)
+    b"\x29\xE7"  # Usage Maximum (0xE7)
+    b"\x15\x00"  # Logical Minimum (0)
+    b"\x25\x01"  # Logical Maximum (1)
+    b"\x75\x01"  # Report Size (1)
+    b"\x95\x08"  # Report Count (8)
+    b"\x81\x02"  # Input (Data,Var,Abs,No Wrap,Linear,Preferred State,No Null Position)
+    b"\x95\x01"  # Report Count (1)
+    b"\x75\x08"  # Report Size (8)
+    b"\x81\x03"  # Input (Const,Var,Abs,No Wrap,Linear,Preferred State,No Null Position)
+    b"\x95\x05"  # Report Count (5)
+    b"\x75\x01"  # Report Size (1)
+    b"\x05\x08"  # Usage Page (LEDs)
+    b"\x19\x01"  # Usage Minimum (Num Lock)
+    b"\x29\x05"  # Usage Maximum (Kana)
+    b"\x91\x02"  # Output (Data,Var,Abs)
+    b"\x95\x01"  # Report Count (1)
+    b"\x75\x03"  # Report Size (3)
+    b"\x91\x03"  # Output (Const,Var,Abs)
+    b"\x95\x06"  # Report Count (6)
+    b"\x75\x08"  # Report Size (8)
+    b"\x15\x00"  # Logical Minimum (0)
+    b"\x25\x65"  # Logical Maximum (101)
+    b"\x05\x07"  # Usage Page (Keyboard/Keypad)
+    b"\x19\x00"  # Usage Minimum (0x00)
+    b"\x29\x65"  # Usage Maximum (0x65)
+    b"\x81\x00"  # Input (Data,Array,Abs,No Wrap,Linear,Preferred State,No Null Position)
+    b"\xC0"  # End Collection
+)
 
 DEV_KERNEL_PATH = f"/sys/kernel/config/usb_gadget/{HID_DEV_NAME}"
+STRINGS_PATH = f"{DEV_KERNEL_PATH}/strings/0x409"
+CONFIG_PATH = f"{DEV_KERNEL_PATH}/configs/c.1"
+FUNCTION_PATH = f"{DEV_KERNEL_PATH}/functions/hid.usb0"
 
 
-def write_to_dev_kernel_file(dev_file, value, write_mode="w"):
+def write_to_dev_kernel_file(dev_file, value):
     """
     Write a value to the device kernel file.
 
     Parameters
     ----------
     dev_file
-        The path to the device file.
+        The absolute path to the device file.
     value
-        The value to write to the file.
-    write_mode : str, optional
-        The mode to open the file in ('w' for write, 'wb' for binary write), by default 'w'.
+        The value to write to the file, either bytes or an ASCII string.
     """
-    dev_file = os.path.join(DEV_KERNEL_PATH, dev_file)
-    with open(dev_file, write_mode) as fd:
-        fd.write(value)
+    data = value if isinstance(value, (bytes, bytearray)) else value.encode("ascii")
+    with open(dev_file, "wb") as fd:
+        fd.write(data)
 
 
 def setup():
     """
     Set up the USB gadget device.
     """
-    os.makedirs(os.path.join(DEV_KERNEL_PATH, "strings/0x409"), exist_ok=True)
-    os.makedirs(os.path.join(DEV_KERNEL_PATH, "configs/c.1/strings/0x409"), exist_ok=True)
-    os.makedirs(os.path.join(DEV_KERNEL_PATH, "functions/hid.usb0"), exist_ok=True)
+    os.makedirs(STRINGS_PATH, exist_ok=True)
+    os.makedirs(f"{CONFIG_PATH}/strings/0x409", exist_ok=True)
+    os.makedirs(FUNCTION_PATH, exist_ok=True)
 
-    write_to_dev_kernel_file("idVendor", f"0x{VENDOR_ID:04x}")
-    write_to_dev_kernel_file("idProduct", f"0x{PRODUCT_ID:04x}")
-    write_to_dev_kernel_file("bcdDevice", "0x0100")
-    write_to_dev_kernel_file("bcdUSB", "0x0200")
+    write_to_dev_kernel_file(f"{DEV_KERNEL_PATH}/idVendor", f"0x{VENDOR_ID:04x}")
+    write_to_dev_kernel_file(f"{DEV_KERNEL_PATH}/idProduct", f"0x{PRODUCT_ID:04x}")
+    write_to_dev_kernel_file(f"{DEV_KERNEL_PATH}/bcdDevice", "0x0100")
+    write_to_dev_kernel_file(f"{DEV_KERNEL_PATH}/bcdUSB", "0x0200")
 
-    write_to_dev_kernel_file("strings/0x409/serialnumber", SERIAL_NUMBER)
-    write_to_dev_kernel_file("strings/0x409/manufacturer", MANUFACTURER)
-    write_to_dev_kernel_file("strings/0x409/product", DESCRIPTION)
+    write_to_dev_kernel_file(f"{STRINGS_PATH}/serialnumber", SERIAL_NUMBER)
+    write_to_dev_kernel_file(f"{STRINGS_PATH}/manufacturer", MANUFACTURER)
+    write_to_dev_kernel_file(f"{STRINGS_PATH}/product", DESCRIPTION)
 
-    write_to_dev_kernel_file("configs/c.1/strings/0x409/configuration", f"Config 1 : {DESCRIPTION}")
-    write_to_dev_kernel_file("configs/c.1/MaxPower", "250")
+    write_to_dev_kernel_file(f"{CONFIG_PATH}/strings/0x409/configuration", f"Config 1 : {DESCRIPTION}")
+    write_to_dev_kernel_file(f"{CONFIG_PATH}/MaxPower", "250")
 
-    write_to_dev_kernel_file("functions/hid.usb0/protocol", "1")
-    write_to_dev_kernel_file("functions/hid.usb0/subclass", "1")
-    write_to_dev_kernel_file("functions/hid.usb0/report_length", REPORT_LENGTH)
-    write_to_dev_kernel_file("functions/hid.usb0/report_desc", REPORT_DESC, "wb")
+    write_to_dev_kernel_file(f"{FUNCTION_PATH}/protocol", "1")
+    write_to_dev_kernel_file(f"{FUNCTION_PATH}/subclass", "1")
+    write_to_dev_kernel_file(f"{FUNCTION_PATH}/report_length", REPORT_LENGTH)
+    write_to_dev_kernel_file(f"{FUNCTION_PATH}/report_desc", REPORT_DESC)
 
-    os.symlink(
-        os.path.join(DEV_KERNEL_PATH, "functions/hid.usb0"),
-        os.path.join(DEV_KERNEL_PATH, "configs/c.1/hid.usb0"),
-        target_is_directory=True
-    )
+    os.symlink(FUNCTION_PATH, f"{CONFIG_PATH}/hid.usb0", target_is_directory=True)
 
-    write_to_dev_kernel_file("UDC", '\r\n'.join(os.listdir("/sys/class/udc")))
+    # configfs accepts exactly one UDC name; bind to the first one found.
+    with os.scandir("/sys/class/udc") as entries:
+        udc = next(entries).name
+    write_to_dev_kernel_file(f"{DEV_KERNEL_PATH}/UDC", udc)
 
 
 async def setup_and_run():
     """
-    Set up the USB gadget device and keep the event loop running.
+    Set up the USB gadget device and block until SIGINT/SIGTERM.
     """
     atexit.register(cleanup)
     setup()
-    while True:
-        await asyncio.sleep(1)  # Keep the event loop running
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()  # Idle in the event loop with no timer wakeups
 
 
 def cleanup():
@@ -143,13 +149,16 @@ def main():
     """
     Main function to set up and run the USB gadget device.
     """
-    user_curr = pwd.getpwuid(os.getuid())
     if os.getuid() != 0:
         print("[KEYBOARD-HID] Attempting to run as <root>")
-        c = os.system(f"/usr/bin/sudo /usr/bin/su root -c '{sys.executable} {' '.join(sys.argv)}'")
-        sys.exit(c)
-
-    print(f"[KEYBOARD-HID] Running as <{user_curr.pw_name}>")
+        # Replaces this process, so signals and exit codes propagate and
+        # argv is passed through without shell expansion.
+        os.execvp("sudo", ["sudo", sys.executable, *sys.argv])
+
+    # Imported lazily: the NSS lookup is only needed on the root branch and
+    # can be slow on systems resolving users through sssd/LDAP.
+    import pwd
+    print(f"[KEYBOARD-HID] Running as <{pwd.getpwuid(os.getuid()).pw_name}>")
     asyncio.run(setup_and_run())
 
 
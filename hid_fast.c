@@ -0,0 +1,141 @@
+/*
+ * Optional C fast path for HIDKeyboard.send_string.
+ *
+ * Takes the ASCII-encoded input, the contiguous 128x16 press+release
+ * report table and the device fd, and runs the write loop without
+ * per-character interpreter overhead. Each table entry is written as
+ * two 8-byte reports (press, then release) since the f_hid gadget
+ * driver caps every write() at the configured report_length.
+ * Unsupported characters are skipped silently (entries with a zero
+ * keycode byte).
+ *
+ * Build in place with:
+ *   cc -O2 -shared -fPIC $(python3-config --includes) hid_fast.c -o hid_fast.so
+ *
+ * hid_keyboard.py falls back to the pure-Python loop when this module
+ * is not built.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <errno.h>
+#include <time.h>
+#include <unistd.h>
+
+#define TABLE_ENTRIES 128
+#define REPORT_SIZE 8
+#define REPORT_PAIR_SIZE 16
+
+/* Retry a busy endpoint for ~100 ms (1 ms backoff per attempt) before
+ * handing control back to the caller for a signal check. */
+#define BUSY_RETRIES 100
+
+/* Write one 8-byte report, retrying briefly while the nonblocking
+ * endpoint is busy. Returns 0 on success or an errno value; a short
+ * write counts as an I/O error since f_hid consumes whole reports, and
+ * EAGAIN means the retries were exhausted so the caller can check for
+ * pending signals before trying again. */
+static int
+write_report(int fd, const char *report)
+{
+    const struct timespec backoff = {0, 1000000};
+
+    for (int attempt = 0; attempt < BUSY_RETRIES; attempt++) {
+        ssize_t written = write(fd, report, REPORT_SIZE);
+        if (written == REPORT_SIZE)
+            return 0;
+        if (written >= 0)
+            return EIO;
+        if (errno != EAGAIN && errno != EWOULDBLOCK && errno != EINTR)
+            return errno;
+        nanosleep(&backoff, NULL);
+    }
+    return EAGAIN;
+}
+
+static PyObject *
+send_encoded(PyObject *self, PyObject *args)
+{
+    int fd;
+    Py_buffer data, table;
+    double delay;
+
+    if (!PyArg_ParseTuple(args, "iy*y*d", &fd, &data, &table, &delay))
+        return NULL;
+
+    if (table.len != TABLE_ENTRIES * REPORT_PAIR_SIZE) {
+        PyBuffer_Release(&data);
+        PyBuffer_Release(&table);
+        PyErr_SetString(PyExc_ValueError, "table must hold 128 16-byte entries");
+        return NULL;
+    }
+
+    const unsigned char *chars = data.buf;
+    const char *reports = table.buf;
+    struct timespec ts;
+    ts.tv_sec = (time_t)delay;
+    ts.tv_nsec = (long)((delay - (double)ts.tv_sec) * 1e9);
+
+    int err = 0;
+    int interrupted = 0;
+    Py_BEGIN_ALLOW_THREADS
+    for (Py_ssize_t i = 0; i < data.len && !err && !interrupted; i++) {
+        unsigned char c = chars[i];
+        if (c >= TABLE_ENTRIES)
+            continue;
+        const char *pair = reports + c * REPORT_PAIR_SIZE;
+        if (pair[2] == 0)
+            continue;
+        /* Press, then release. When the endpoint stays busy past the
+         * bounded retries, re-acquire the GIL and let Ctrl+C through
+         * before retrying, so a dead host cannot wedge us forever. */
+        for (int half = 0; half < 2 && !err && !interrupted; half++) {
+            const char *report = pair + half * REPORT_SIZE;
+            while ((err = write_report(fd, report)) == EAGAIN) {
+                Py_BLOCK_THREADS
+                interrupted = PyErr_CheckSignals();
+                Py_UNBLOCK_THREADS
+                if (interrupted) {
+                    err = 0;
+                    break;
+                }
+            }
+        }
+        if (!err && !interrupted && delay > 0)
+            nanosleep(&ts, NULL);
+    }
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&data);
+    PyBuffer_Release(&table);
+
+    if (interrupted)
+        return NULL;  /* exception set by PyErr_CheckSignals */
+    if (err) {
+        errno = err;
+        return PyErr_SetFromErrno(PyExc_OSError);
+    }
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef hid_fast_methods[] = {
+    {"send_encoded", send_encoded, METH_VARARGS,
+     "send_encoded(fd, data, table, delay)\n\n"
+     "Write the press+release report pair for each byte of data to fd,\n"
+     "sleeping delay seconds between keystrokes."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef hid_fast_module = {
+    PyModuleDef_HEAD_INIT,
+    "hid_fast",
+    "C write loop for HIDKeyboard.send_string.",
+    -1,
+    hid_fast_methods
+};
+
+PyMODINIT_FUNC
+PyInit_hid_fast(void)
+{
+    return PyModule_Create(&hid_fast_module);
+}
@@ -1,6 +1,60 @@
 import logging
+import os
 import time
-from re import sub
+
+try:
+    import hid_fast  # optional C write loop, see hid_fast.c
+except ImportError:
+    hid_fast = None
+
+ZERO_REPORT = bytes(8)
+
+# Linux caps a single writev() at this many buffers (UIO_MAXIOV).
+IOV_MAX = 1024
+
+# mlockall() flags from <sys/mman.h>.
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+
+def _build_char_reports(simple_chars, shift_chars, shift_modifier):
+    """Precompute an 8-byte HID press report for every supported ASCII
+    character.
+
+    Returns a 128-entry list indexed by ``ord(character)``; entries for
+    unsupported characters are ``None``. The f_hid gadget driver caps each
+    write() at the configured report_length (8), so press and release must
+    go to the device as separate 8-byte reports.
+    """
+    reports = [None] * 128
+    for character, keycode in simple_chars.items():
+        reports[ord(character)] = bytes([0, 0, keycode, 0, 0, 0, 0, 0])
+    for character, keycode in shift_chars.items():
+        # simple_chars wins for characters listed in both (e.g. '#'),
+        # matching the original SIMPLE_CHARS-first branch order.
+        if reports[ord(character)] is None:
+            reports[ord(character)] = bytes([shift_modifier, 0, keycode, 0, 0, 0, 0, 0])
+    return reports
+
+
+def _build_modifier_bits(command_keys, modifier_key):
+    """Map each command keycode to its modifier-byte bit (0 for regular
+    keys), so send_commands can fetch it with one list index."""
+    bits = [0] * 256
+    for name, bit in modifier_key.items():
+        bits[command_keys[name]] = bit
+    return bits
+
+
+def _build_valid_mask(reports):
+    """Pack the supported codepoints of a report table into a 128-bit
+    bitmap, so membership is a shift and a bit test instead of a lookup
+    and a None comparison."""
+    mask = 0
+    for codepoint, report in enumerate(reports):
+        if report is not None:
+            mask |= 1 << codepoint
+    return mask
 
 
 class HIDKeyboard:
@@ -33,18 +87,67 @@ class HIDKeyboard:
 
     MODIFIER_KEY = {'LEFT_CONTROL': 0x01, 'LEFT_SHIFT': 0x02, 'LEFT_ALT': 0x04,
                     'LEFT_GUI': 0x08, 'RIGHT_CONTROL': 0x10,
-                    'RIGHT_SHIFT': 0x20, 'RIGHT_ALT': 0x40, 'RIGHT_GUI ': 0x80}
+                    'RIGHT_SHIFT': 0x20, 'RIGHT_ALT': 0x40, 'RIGHT_GUI': 0x80}
 
-    def __init__(self, typing_delay: float = 0, device='/dev/hidg0'):
+    COMMAND_ALIASES = {'CONTROL': 'LEFT_CONTROL', 'CTRL': 'LEFT_CONTROL',
+                       'SHIFT': 'LEFT_SHIFT', 'ALT': 'LEFT_ALT', 'GUI': 'LEFT_GUI',
+                       'WIN': 'LEFT_GUI', 'WINDOWS': 'LEFT_GUI'}
+
+    CHAR_REPORTS = _build_char_reports(SIMPLE_CHARS, SHIFT_CHARS, MODIFIER_KEY['LEFT_SHIFT'])
+    MODIFIER_BITS = _build_modifier_bits(COMMAND_KEYS, MODIFIER_KEY)
+    VALID_MASK = _build_valid_mask(CHAR_REPORTS)
+    # Contiguous press+release pairs for the C fast path (16 bytes per
+    # entry, written as two 8-byte reports); unsupported characters are
+    # all-zero entries.
+    CHAR_TABLE = b''.join((report or bytes(8)) + ZERO_REPORT for report in CHAR_REPORTS)
+
+    def __init__(self, typing_delay: float = 0, device='/dev/hidg0', realtime: bool = False):
         """
         Initialize the HIDKeyboard.
 
         Args:
             typing_delay (float, optional): Delay between sending each character. Defaults to 0.
             device (str, optional): Path to the HID device. Defaults to '/dev/hidg0'.
+            realtime (bool, optional): Switch to SCHED_FIFO scheduling and lock
+                memory to reduce keystroke timing jitter. Requires root. Defaults to False.
         """
         self.typing_delay = typing_delay
         self.device = device
+        self._fd = None
+        # Write-only and unbuffered; O_NONBLOCK so a stalled endpoint shows
+        # up as EAGAIN instead of wedging the caller indefinitely.
+        self._fd = os.open(device, os.O_WRONLY | os.O_NONBLOCK)
+        # Scratch report reused by send_commands to avoid a fresh bytearray
+        # per call; character reports come prebuilt from CHAR_REPORTS.
+        self._report = bytearray(8)
+        if realtime:
+            self._enable_realtime()
+
+    def _enable_realtime(self):
+        """Switch to SCHED_FIFO priority and lock pages in RAM so keystroke
+        timing is not disturbed by the CFS scheduler or page faults."""
+        import ctypes
+
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+            ctypes.CDLL("libc.so.6", use_errno=True).mlockall(MCL_CURRENT | MCL_FUTURE)
+        except PermissionError:
+            logging.warning("unable to enable realtime scheduling (requires root)")
+
+    def close(self):
+        """Close the HID device."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        self.close()
 
     def send_string(self, string: str):
         """
@@ -53,10 +156,51 @@ class HIDKeyboard:
         Args:
             string (str): The string to be sent as keystrokes.
         """
-        characters = str(string.strip())
-        list_string = list(characters)
-        for character in list_string:
-            self.send_char(character)
+        # Encode once and iterate integer codepoints: a bytes loop yields
+        # ints at C speed, with no 1-char string objects or hashing.
+        # Non-ASCII characters are typed as '?'.
+        self.send_encoded(str(string).strip().encode('ascii', errors='replace'))
+
+    def send_encoded(self, data: bytes):
+        """
+        Send pre-encoded ASCII bytes as keystrokes.
+
+        Fast entry point for callers that already hold encoded input and
+        want to skip the per-call strip/encode of send_string.
+
+        Args:
+            data (bytes): The ASCII-encoded characters to be sent as keystrokes.
+        """
+        if hid_fast is not None and len(data) > 8:
+            # C loop: no per-character interpreter work, but unsupported
+            # characters are skipped without a warning.
+            hid_fast.send_encoded(self._fd, data, self.CHAR_TABLE, self.typing_delay)
+            return
+
+        reports = self.CHAR_REPORTS
+        valid_mask = self.VALID_MASK
+
+        if self.typing_delay:
+            for codepoint in data:
+                if not (valid_mask >> codepoint) & 1:
+                    logging.warning("unable to send unlisted character %r", chr(codepoint))
+                    continue
+                self._send_report(reports[codepoint])
+                time.sleep(self.typing_delay)
+            return
+
+        # No inter-key delay: batch every (press, release) pair into as few
+        # writev() calls as the kernel allows.
+        buffers = []
+        for codepoint in data:
+            if not (valid_mask >> codepoint) & 1:
+                logging.warning("unable to send unlisted character %r", chr(codepoint))
+                continue
+            buffers.append(reports[codepoint])
+            buffers.append(ZERO_REPORT)
+
+        for start in range(0, len(buffers), IOV_MAX):
+            self._writev(buffers[start:start + IOV_MAX])
 
     def send_char(self, character: str):
         """
@@ -65,69 +209,87 @@ class HIDKeyboard:
         Args:
             character (str): The character to be sent as a keystroke.
         """
-        report = bytearray(8)
-
-        if character in self.SIMPLE_CHARS:
-            report[2] = self.SIMPLE_CHARS[character]
+        codepoint = ord(character)
 
-        elif character in self.SHIFT_CHARS:
-            report[0] = self.MODIFIER_KEY['LEFT_SHIFT']
-            report[2] = self.SHIFT_CHARS[character]
-
-        else:
+        if codepoint >= 128 or not (self.VALID_MASK >> codepoint) & 1:
             logging.warning("unable to send unlisted character %r", character)
             return
 
-        self._write_report_to_dev(report)
-        self._release_all_keys()
+        self._send_report(self.CHAR_REPORTS[codepoint])
         time.sleep(self.typing_delay)
 
     def send_commands(self, commands: str):
-        commands = commands.strip()
-
-        report = bytearray(8)
+        command = commands.strip().upper()
 
-        commands = sub('(.*)CONTROL', 'LEFT_CONTROL', commands)
-        commands = sub('(.*)CTRL', 'LEFT_CONTROL', commands)
-        commands = sub('(.*)SHIFT', 'LEFT_SHIFT', commands)
-        commands = sub('(.*)ALT', 'LEFT_ALT', commands)
-        commands = sub('(.*)GUI', 'LEFT_GUI', commands)
-        commands = sub('(.*)WIN', 'LEFT_GUI', commands)
-        commands = sub('(.*)WINDOWS', 'LEFT_GUI', commands)
-
-        word_count = len(commands.split())
-
-        if word_count != 1:
+        if not command or ' ' in command:
             logging.warning("unable to send multiple command at a time")
             return
 
-        if commands in self.COMMAND_KEYS:
-            report[2] = self.COMMAND_KEYS[commands]
-        else:
+        command = self.COMMAND_ALIASES.get(command, command)
+        keycode = self.COMMAND_KEYS.get(command)
+
+        if keycode is None:
             logging.warning("unable to send unlisted command %r", commands)
             return
 
-        self._write_report_to_dev(report)
-        self._release_all_keys()
-        time.sleep(self.typing_delay)
-
+        report = self._report
+        modifier_bit = self.MODIFIER_BITS[keycode]
+        if modifier_bit:
+            # Modifier keys are encoded in the modifier byte, not the key array.
+            report[0] = modifier_bit
+        else:
+            report[2] = keycode
 
-    def _release_all_keys(self):
-        """Release all keys."""
-        self._write_report_to_dev(bytearray(8))
+        try:
+            self._send_report(report)
+        finally:
+            # Always clear the scratch buffer, or a failed write would leak
+            # stale modifier/keycode bytes into the next command.
+            report[0] = 0
+            report[2] = 0
+        time.sleep(self.typing_delay)
 
-    def _write_report_to_dev(self, report: bytearray):
+    def _send_report(self, report: bytes):
         """
-        Write the report to the HID device.
+        Write a key-press report followed by the zero release report to the
+        HID device in a single writev() call.
 
         Args:
-            report (bytearray): The report to be written to the HID device.
+            report (bytes): The press report to be written to the HID device.
+        """
+        self._writev((report, ZERO_REPORT))
+
+    def _writev(self, buffers):
+        """Write a batch of report buffers, resuming after partial progress.
+
+        The gadget driver consumes one report per write and returns EAGAIN
+        until the host polls the endpoint again, so a writev() batch
+        routinely stops short with a partial count rather than an error.
+        Drop the buffers already consumed, back off briefly and retry the
+        remainder.
         """
-        with open(self.device, 'rb+') as file_handler:
-            file_handler.write(report)
+        buffers = list(buffers)
+        index = 0
+        while index < len(buffers):
+            try:
+                written = os.writev(self._fd, buffers[index:])
+            except BlockingIOError:
+                time.sleep(0.001)
+                continue
+            while written and written >= len(buffers[index]):
+                written -= len(buffers[index])
+                index += 1
+            if written:
+                # Partial report: resume from the unwritten tail.
+                buffers[index] = memoryview(buffers[index])[written:]
+            if index < len(buffers):
+                time.sleep(0.001)
+
+MSG = "A very s1mpl3 ex@mple"
+MSG_BYTES = MSG.encode('ascii')
 
 if __name__ == "__main__":
     hid = HIDKeyboard()
     while 1:
-        hid.send_string("A very s1mpl3 ex@mple")
+        hid.send_encoded(MSG_BYTES)
         time.sleep(3)
\ No newline at end of file